@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 import argparse
+import email.utils
+import html
+import http.client
+import json
 import os
 import re
 import urllib.parse
-import urllib.request
+import string
 import sys
 import tempfile
-import mimetypes
-from pathlib import Path
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 try:
     from tqdm import tqdm
@@ -31,6 +36,92 @@ except ImportError:
     HAS_EYED3 = False
     print("eyed3 not installed, no metadata will be injected into audio files")
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+    print("selectolax not installed, falling back to slower regex HTML parsing")
+
+# Read size when streaming downloads without a progress bar; with one, reads
+# are scaled to the file size between MIN_READ_CHUNK and MAX_READ_CHUNK
+READ_DATA_CHUNK = 128 * 1024
+MIN_READ_CHUNK = 8192
+MAX_READ_CHUNK = 1024 * 1024
+# Files smaller than this are downloaded without a progress bar
+PROGRESS_MIN_SIZE = 512 * 1024
+# Downloads are written under the remote file name plus this suffix and renamed
+# once complete, so an interrupted download can be resumed with a Range request
+# on the next run. The remote name is unique per upload, unlike titles
+PART_SUFFIX = '.part'
+_RE_CONTENT_RANGE = re.compile(r'bytes (\d+)-')
+# Metadata is injected by a small background pool; at most METADATA_QUEUE_SIZE
+# files may be waiting for it before downloads block
+METADATA_WORKERS = 2
+METADATA_QUEUE_SIZE = 16
+# Text metadata for every download is appended to this file in the output directory
+METADATA_LOG_NAME = 'metadata.jsonl'
+METADATA_LOG_BUFFER = 1024 * 1024
+# Redirect statuses followed by _make_request, and how many hops to allow
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+# Statuses the server uses to ask us to slow down; these are retried after
+# the server's Retry-After, or with exponential back-off capped at BACKOFF_MAX
+RETRY_CODES = (429, 503)
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Patterns used to scrape the raw page bytes when selectolax is not available;
+# matching bytes avoids decoding whole pages just to search them
+_RE_NEXT_CLASSIC = re.compile(rb'<a class="button-link right" href="([^"]+)">Next &nbsp;&#x276f;&#x276f;</a>')
+_RE_NEXT_MODERN = re.compile(rb'<form action="([^"]+)"[^>]*>\s*<button[^>]*type="submit">Next')
+_RE_ARTWORK = re.compile(rb'<a href="(/view/\d+/)"')
+_RE_IMAGE = re.compile(rb'href="(//d\.furaffinity\.net/art/[^"]+)"')
+# Description, title and artist are collected in a single scan of the page
+_RE_META_CLASSIC = re.compile(
+    rb'og:description" content="(?P<description>[^"]*)"'
+    rb'|<h2>(?P<title>.*?)</h2>'
+    rb'|<a href="/user/(?P<artist>[^/"]+)/">',
+    re.DOTALL,
+)
+_RE_META_MODERN = re.compile(
+    rb'og:description" content="(?P<description>[^"]*)"'
+    rb'|<h2><p>(?P<title>.*?)</p></h2>'
+    rb'|<a href="/user/(?P<artist>[^/"]+)/">',
+    re.DOTALL,
+)
+# Markup inside a matched title; removed so the fallback yields the same text
+# as selectolax
+_RE_TAG = re.compile(r'<[^>]*>')
+# Link targets checked on parsed trees
+_RE_VIEW_PATH = re.compile(r'/view/\d+/')
+_RE_USER_PATH = re.compile(r'/user/([^/"]+)/')
+# Characters that urllib.parse.quote(path, safe='/:') would escape
+_RE_PATH_NEEDS_QUOTING = re.compile(r'[^A-Za-z0-9_.~/:-]')
+
+
+class _TitleTable(dict):
+    # str.translate table replacing anything outside _SAFE_TITLE_CHARS with a
+    # space; entries for non-ASCII characters are added as they are seen
+    def __missing__(self, codepoint):
+        self[codepoint] = ' '
+        return ' '
+
+
+_SAFE_TITLE_CHARS = frozenset(string.ascii_letters + string.digits + '._-')
+_TITLE_TRANS = _TitleTable({c: c if chr(c) in _SAFE_TITLE_CHARS else ' ' for c in range(128)})
+
+# MIME types of the formats we can inject metadata into, by file extension
+_EXT_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+}
+
 
 class FurAffinitySearchDownloader:
     def __init__(self, args):
@@ -42,14 +133,27 @@ class FurAffinitySearchDownloader:
         self.max_duplicates = args.max_duplicates
         self.overwrite = args.overwrite
         self.text_meta = args.separate_meta
+        self.meta_files = args.meta_files
         self.classic = args.classic
         self.perpage = args.perpage
+        self.jobs = max(1, args.jobs)
         self.cookie_file = args.cookie_file
         self.search_query = args.search_query
         
+        # Theme-dependent patterns, picked once instead of on every page
+        self._re_next = _RE_NEXT_CLASSIC if self.classic else _RE_NEXT_MODERN
+        self._re_meta = _RE_META_CLASSIC if self.classic else _RE_META_MODERN
+        
         # Create output directory if it doesn't exist
         os.makedirs(self.outdir, exist_ok=True)
         
+        # Text metadata goes to one buffered log rather than a file per download
+        self._meta_log = None
+        self._meta_log_lock = threading.Lock()
+        if self.text_meta and self.metadata:
+            self._meta_log = open(os.path.join(self.outdir, METADATA_LOG_NAME), 'a',
+                                  encoding='utf-8', buffering=METADATA_LOG_BUFFER)
+        
         # Set up session headers
         self.headers = {
             'User-Agent': 'Mozilla/5.0 furaffinity-search-dl (Python)'
@@ -59,6 +163,20 @@ class FurAffinitySearchDownloader:
         self.cookies = {}
         if self.cookie_file:
             self._load_cookies()
+        if self.cookies:
+            self.headers['Cookie'] = '; '.join([f"{k}={v}" for k, v in self.cookies.items()])
+        
+        # Keep-alive connections, one per host for each worker thread
+        self._local = threading.local()
+        
+        # Monotonic time before which no request may be sent, shared by all workers
+        self._throttle_until = 0.0
+        self._throttle_lock = threading.Lock()
+        
+        # File names present in each artist directory, listed on the first visit
+        # and kept up to date with our own downloads, so duplicate checks need
+        # no stat calls
+        self._artist_files = {}
 
     def _load_cookies(self):
         try:
@@ -76,112 +194,314 @@ class FurAffinitySearchDownloader:
             print(f"Error loading cookies: {e}")
             sys.exit(1)
 
-    def _make_request(self, url):
-        parsed = urllib.parse.urlparse(url)
-        encoded_path = urllib.parse.quote(parsed.path, safe='/:')
-        encoded_url = parsed._replace(path=encoded_path).geturl()
+    def _get_connection(self, scheme, host, fresh=False):
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
         
-        request = urllib.request.Request(encoded_url, headers=self.headers)
+        conn = connections.get((scheme, host))
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conn = connections[(scheme, host)] = conn_class(host)
+        return conn
+
+    def _throttle(self, delay):
+        with self._throttle_lock:
+            self._throttle_until = max(self._throttle_until, time.monotonic() + delay)
+
+    def _wait_for_throttle(self):
+        delay = self._throttle_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.getheader('Retry-After')
+        if retry_after:
+            if retry_after.strip().isdigit():
+                return float(retry_after)
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after).timestamp()
+                return max(retry_at - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+        return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+
+    def _check_rate_limit(self, response):
+        # Only pause when the server reports that the quota is nearly used up
+        remaining = response.getheader('X-RateLimit-Remaining')
+        reset = response.getheader('X-RateLimit-Reset')
+        try:
+            if remaining is None or int(remaining) > 1 or reset is None:
+                return
+            reset = float(reset)
+        except ValueError:
+            return
         
-        if self.cookies:
-            cookie_str = '; '.join([f"{k}={v}" for k, v in self.cookies.items()])
-            request.add_header('Cookie', cookie_str)
-            
+        # The reset is sent either as seconds from now or as a Unix timestamp
+        if reset > time.time() - 86400:
+            reset -= time.time()
+        if reset > 0:
+            print(f"Rate limit nearly reached, pausing for {reset:.1f}s")
+            self._throttle(reset)
+
+    def _send(self, scheme, host, path, headers):
+        self._wait_for_throttle()
+        conn = self._get_connection(scheme, host)
         try:
-            return urllib.request.urlopen(request)
-        except urllib.error.HTTPError as e:
-            if e.code == 403 or e.code == 401:
-                print(f"Error: Authentication failed. Please check your cookies. ({e.code})")
+            conn.request('GET', path, headers=headers)
+            return conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # The server may have dropped the idle connection, or a previous
+            # response was abandoned mid-read; retry once on a new connection
+            conn = self._get_connection(scheme, host, fresh=True)
+            conn.request('GET', path, headers=headers)
+            return conn.getresponse()
+
+    def _make_request(self, url, extra_headers=None):
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        ranged = bool(extra_headers) and 'Range' in extra_headers
+        redirects = 0
+        retries = 0
+        while True:
+            parsed = urllib.parse.urlsplit(url)
+            # Submission and search paths are plain ASCII; only image paths
+            # built from file names usually need escaping
+            path = parsed.path
+            if _RE_PATH_NEEDS_QUOTING.search(path):
+                path = urllib.parse.quote(path, safe='/:')
+            if parsed.query:
+                path += '?' + parsed.query
+            
+            try:
+                response = self._send(parsed.scheme, parsed.netloc, path, headers)
+            except Exception as e:
+                print(f"Error accessing {url}: {e}")
+                return None
+            
+            self._check_rate_limit(response)
+            
+            if response.status in RETRY_CODES and retries < MAX_RETRIES:
+                delay = self._retry_delay(response, retries)
+                response.read()
+                retries += 1
+                print(f"Server busy ({response.status}), retrying {url} in {delay:.1f}s")
+                self._throttle(delay)
+                continue
+            
+            if response.status in REDIRECT_CODES:
+                location = response.getheader('Location')
+                # Drain the body so the connection can be reused
+                response.read()
+                if not location:
+                    print(f"HTTP Error: {response.status} - redirect without location for URL: {url}")
+                    return None
+                redirects += 1
+                if redirects > MAX_REDIRECTS:
+                    print(f"Error accessing {url}: too many redirects")
+                    return None
+                url = urllib.parse.urljoin(url, location)
+                continue
+            
+            if response.status == 403 or response.status == 401:
+                print(f"Error: Authentication failed. Please check your cookies. ({response.status})")
                 sys.exit(1)
-            else:
-                print(f"HTTP Error: {e.code} - {e.reason} for URL: {url}")
+            elif response.status == 416 and ranged:
+                # Let the caller decide what to do with an unsatisfiable range
+                pass
+            elif response.status >= 400:
+                response.read()
+                print(f"HTTP Error: {response.status} - {response.reason} for URL: {url}")
                 return None
-        except Exception as e:
-            print(f"Error accessing {url}: {e}")
-            return None
+            
+            response.url = url
+            return response
+
+    def _range_start(self, response):
+        match = _RE_CONTENT_RANGE.match(response.getheader('Content-Range') or '')
+        return int(match.group(1)) if match else None
 
     def _download_file(self, url, file_path):
-        if os.path.exists(file_path) and not self.overwrite:
-            print(f"File already exists, skipping: {file_path}")
-            return False
+        # The caller has already checked that file_path does not exist
+        part_path = os.path.join(os.path.dirname(file_path), os.path.basename(url) + PART_SUFFIX)
+        offset = 0
+        if os.path.exists(part_path) and not self.overwrite:
+            offset = os.path.getsize(part_path)
             
         try:
-            response = self._make_request(url)
+            response = self._make_request(url, {'Range': f"bytes={offset}-"} if offset else None)
             if not response:
                 return False
+            
+            if response.status == 416 or (response.status == 206 and self._range_start(response) != offset):
+                # The partial file does not match what the server sends; start over
+                response.read()
+                os.remove(part_path)
+                return self._download_file(url, file_path)
+            
+            # A server that ignores the Range header sends the whole file again
+            if response.status != 206:
+                offset = 0
                 
-            file_size = int(response.headers.get('Content-Length', 0))
+            content_length = response.headers.get('Content-Length')
+            file_size = offset + int(content_length or 0)
+            written = 0
+            interrupted = False
             
-            with open(file_path, 'wb') as out_file:
-                if HAS_TQDM and file_size > 0:
-                    with tqdm(total=file_size, unit='B', unit_scale=True, desc=os.path.basename(file_path)) as pbar:
-                        while True:
-                            chunk = response.read(8192)
-                            if not chunk:
-                                break
-                            out_file.write(chunk)
-                            pbar.update(len(chunk))
+            with open(part_path, 'ab' if offset else 'wb') as out_file:
+                pbar = None
+                if HAS_TQDM and file_size > PROGRESS_MIN_SIZE:
+                    buffer_size = max(MIN_READ_CHUNK, min(MAX_READ_CHUNK, file_size // 100))
+                    pbar = tqdm(total=file_size, initial=offset, unit='B', unit_scale=True, desc=os.path.basename(file_path))
                 else:
-                    print(f"Downloading: {os.path.basename(file_path)}")
-                    out_file.write(response.read())
+                    buffer_size = READ_DATA_CHUNK
+                    if offset:
+                        print(f"Resuming download: {os.path.basename(file_path)} ({offset} bytes already downloaded)")
+                    else:
+                        print(f"Downloading: {os.path.basename(file_path)}")
+                
+                try:
+                    while True:
+                        # Give up promptly when the run is stopped (Ctrl-C or a limit
+                        # reached elsewhere); the partial file is resumed next time
+                        if self._stop.is_set():
+                            interrupted = True
+                            break
+                        # read1 returns whatever has arrived instead of blocking until
+                        # a whole buffer is filled, so the check above runs regularly
+                        chunk = response.read1(buffer_size)
+                        if not chunk:
+                            break
+                        out_file.write(chunk)
+                        written += len(chunk)
+                        if pbar:
+                            pbar.update(len(chunk))
+                finally:
+                    if pbar:
+                        pbar.close()
+            
+            complete = content_length is not None and offset + written == file_size
+            if interrupted and not complete:
+                print(f"Download interrupted, keeping partial file: {part_path}")
+                return False
+            
+            # http.client returns a short body instead of raising when the
+            # connection drops mid-read; keep the partial file for a resume
+            if content_length is not None and offset + written != file_size:
+                print(f"Error downloading {url}: received {offset + written} of {file_size} bytes, keeping partial file")
+                return False
             
+            os.replace(part_path, file_path)
             return True
             
         except Exception as e:
+            # Keep the partial file so the next run can resume it
             print(f"Error downloading {url}: {e}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
             return False
 
-    def _extract_next_page_url(self, html_content):
-        if self.classic:
-            match = re.search(r'<a class="button-link right" href="([^"]+)">Next &nbsp;&#x276f;&#x276f;</a>', html_content)
-        else:
-            match = re.search(r'<form action="([^"]+)"[^>]*>\s*<button[^>]*type="submit">Next', html_content)
+    def _parse_html(self, raw_html):
+        # Pages are parsed once and the result handed to every extractor;
+        # without selectolax the extractors scan the raw bytes instead.
+        # Lexbor decodes the bytes itself, so no intermediate str is built
+        if HAS_SELECTOLAX:
+            return LexborHTMLParser(raw_html)
+        return raw_html
+
+    def _extract_next_page_url(self, document):
+        if HAS_SELECTOLAX:
+            path = None
+            if self.classic:
+                for node in document.css('a.button-link.right'):
+                    if node.text().startswith('Next'):
+                        path = node.attributes.get('href')
+                        break
+            else:
+                for node in document.css('form'):
+                    button = node.css_first('button[type="submit"]')
+                    if button and button.text(strip=True).startswith('Next'):
+                        path = node.attributes.get('action')
+                        break
+            return "https://www.furaffinity.net" + path if path else None
         
+        match = self._re_next.search(document)
         if match:
-            return "https://www.furaffinity.net" + match.group(1)
+            return "https://www.furaffinity.net" + match.group(1).decode('utf-8')
         return None
 
-    def _extract_artwork_urls(self, html_content):
-        return re.findall(r'<a href="(/view/\d+/)"', html_content)
+    def _extract_artwork_urls(self, document):
+        if HAS_SELECTOLAX:
+            hrefs = (node.attributes.get('href') or '' for node in document.css('a[href^="/view/"]'))
+            return [href for href in hrefs if _RE_VIEW_PATH.fullmatch(href)]
+        return [path.decode('ascii') for path in _RE_ARTWORK.findall(document)]
 
-    def _extract_image_url(self, html_content):
-        match = re.search(r'href="//d\.furaffinity\.net/art/[^"]+"', html_content)
-        if match:
-            url = match.group(0)[6:-1]  # Remove 'href="' and '"'
+    def _extract_image_url(self, document):
+        if HAS_SELECTOLAX:
+            node = document.css_first('[href^="//d.furaffinity.net/art/"]')
+            url = node.attributes['href'] if node else None
+        else:
+            match = _RE_IMAGE.search(document)
+            url = match.group(1).decode('utf-8') if match else None
+        
+        if url:
             protocol = "https:" if self.use_https else "http:"
             return protocol + url
         return None
 
-    def _extract_metadata(self, html_content):
-        desc_match = re.search(r'og:description" content="([^"]*)"', html_content)
-        description = desc_match.group(1) if desc_match else ""
+    def _extract_metadata(self, document):
+        if HAS_SELECTOLAX:
+            return self._extract_metadata_tree(document)
         
-        if self.classic:
-            title_match = re.search(r'<h2>(.*?)</h2>', html_content, re.DOTALL)
-        else:
-            title_match = re.search(r'<h2><p>(.*?)</p></h2>', html_content, re.DOTALL)
+        found = {}
+        for match in self._re_meta.finditer(document):
+            field = match.lastgroup
+            # Match what selectolax returns: title text without inner tags, and
+            # entities decoded in every field
+            value = match.group(field).decode('utf-8')
+            if field == 'title':
+                value = _RE_TAG.sub('', value)
+            value = html.unescape(value)
+            if field in found or (field == 'artist' and value == "your username"):
+                continue
+            found[field] = value
+            if len(found) == 3:
+                break
+        
+        title = found.get('title', "Untitled")
+        description = found.get('description', "")
+        artist = found.get('artist', "unknown_artist")
+        return title, description, artist
+
+    def _extract_metadata_tree(self, tree):
+        desc_node = tree.css_first('meta[property="og:description"]')
+        description = (desc_node.attributes.get('content') or "") if desc_node else ""
         
-        title = title_match.group(1) if title_match else "Untitled"
+        title_node = tree.css_first('h2' if self.classic else 'h2 > p')
+        title = title_node.text() if title_node else "Untitled"
         
-        artist_matches = re.finditer(r'<a href="/user/([^/"]+)/">', html_content)
+        # The artist link is a bare <a href="/user/name/">; navigation links
+        # to user pages carry extra attributes
         artist = "unknown_artist"
-        for match in artist_matches:
-            username = match.group(1)
-            if username != "your username":
-                artist = username
+        for node in tree.css('a[href^="/user/"]'):
+            if list(node.attributes) != ['href']:
+                continue
+            match = _RE_USER_PATH.fullmatch(node.attributes['href'] or '')
+            if match and match.group(1) != "your username":
+                artist = match.group(1)
                 break
         
         return title, description, artist
 
-    def _add_metadata(self, file_path, title, description):
+    def _add_metadata(self, file_path, title, description, mime_type):
         if not self.metadata:
             return
-            
-        mime_type, _ = mimetypes.guess_type(file_path)
         
-        if self.text_meta:
+        if self._meta_log:
+            line = json.dumps({'path': file_path, 'title': title, 'description': description}, ensure_ascii=False)
+            with self._meta_log_lock:
+                self._meta_log.write(line + '\n')
+        
+        if self.meta_files:
             with open(f"{file_path}.meta", 'w', encoding='utf-8') as f:
                 f.write(f"Title: {title}\nURL: {file_path}\nDescription: {description}")
         
@@ -213,102 +533,194 @@ class FurAffinitySearchDownloader:
             except Exception as e:
                 print(f"Error adding image metadata: {e}")
 
-    def download_search_results(self):
+    def _process_submission(self, page_path):
+        if self._stop.is_set():
+            return
+
+        page_url = f"https://www.furaffinity.net{page_path}"
+        print(f"Processing submission: {page_url}")
+        
+        artwork_response = self._make_request(page_url)
+        if not artwork_response:
+            return
+            
+        raw_html = artwork_response.read()
+        
+        # Skip if system message (inaccessible)
+        if b"System Message" in raw_html:
+            print(f"WARNING: {page_path} seems to be inaccessible, skipping.")
+            return
+        
+        document = self._parse_html(raw_html)
+        # Only the parsed document is needed from here on; drop the page bytes
+        # rather than holding them for the whole download
+        del raw_html
+        image_url = self._extract_image_url(document)
+        if not image_url:
+            print(f"WARNING: Could not find download URL for {page_path}, skipping.")
+            return
+        
+        title, description, artist = self._extract_metadata(document)
+        
+        artist_dir = os.path.join(self.outdir, artist)
+        existing = self._artist_files.get(artist)
+        if existing is None:
+            os.makedirs(artist_dir, exist_ok=True)
+            existing = self._artist_files.setdefault(artist, set(os.listdir(artist_dir)))
+        
+        file_ext = os.path.splitext(image_url)[1]
+        file_name = os.path.basename(image_url)
+        
+        if self.rename:
+            safe_title = title.translate(_TITLE_TRANS)
+            file_name = f"{safe_title}{file_ext}"
+        file_path = os.path.join(artist_dir, file_name)
+        
+        # Check and claim the target path under the lock so that two workers
+        # never write the same file and the limits are never overshot
+        with self._state:
+            waited = False
+            while True:
+                if self._stop.is_set():
+                    if waited:
+                        print(f"Stopped while waiting for a download slot, skipping: {page_path}")
+                    return
+                # The cached listing answers the common duplicate case without a
+                # stat; a miss is confirmed on disk, since the filesystem may be
+                # case-insensitive where the set is not
+                if file_path in self._claimed or (not self.overwrite and (file_name in existing or os.path.exists(file_path))):
+                    print(f"File already exists, skipping: {file_path}")
+                    self.duplicate_count += 1
+                    if self.max_duplicates > 0 and self.duplicate_count >= self.max_duplicates:
+                        print(f"Reached set maximum of consecutive duplicate files ({self.max_duplicates})")
+                        self._stop.set()
+                        self._state.notify_all()
+                    return
+                if self.max_files > 0 and self.download_count + len(self._claimed) >= self.max_files:
+                    # The remaining slots are taken by in-flight downloads; if one
+                    # of them fails, this submission takes its place
+                    waited = True
+                    self._state.wait()
+                    continue
+                break
+            self._claimed.add(file_path)
+        
+        success = False
+        try:
+            success = self._download_file(image_url, file_path)
+        finally:
+            # Release the claim even if the download raised, so waiting workers wake up
+            with self._state:
+                self._claimed.discard(file_path)
+                if success:
+                    existing.add(file_name)
+                    self.duplicate_count = 0
+                    self.download_count += 1
+                    
+                    # Check if we've reached the download limit
+                    if self.max_files > 0 and self.download_count >= self.max_files:
+                        print(f"Reached set file download limit ({self.max_files}).")
+                        self._stop.set()
+                self._state.notify_all()
+        
+        if not success:
+            return
+        
+        # Add metadata to the file in the background
+        if self.metadata:
+            self._queue_metadata(file_path, title, description, _EXT_MIME.get(file_ext.lower()))
+
+    def _queue_metadata(self, file_path, title, description, mime_type):
+        self._metadata_slots.acquire()
+        future = self._metadata_executor.submit(self._add_metadata, file_path, title, description, mime_type)
+        future.add_done_callback(self._metadata_done)
+
+    def _metadata_done(self, future):
+        self._metadata_slots.release()
+        if future.exception():
+            print(f"Error adding metadata: {future.exception()}")
+
+    def _search_url(self, page_num):
         encoded_query = urllib.parse.quote(self.search_query)
-        base_url = f"https://www.furaffinity.net/search/?q={encoded_query}&perpage={self.perpage}&order-by=date&order-direction=desc&page=1"
+        return f"https://www.furaffinity.net/search/?q={encoded_query}&perpage={self.perpage}&order-by=date&order-direction=desc&page={page_num}"
+
+    def _fetch_search_page(self, page_num):
+        response = self._make_request(self._search_url(page_num))
+        if not response:
+            return None
+        return response.url, response.read()
+
+    def download_search_results(self):
+        base_url = self._search_url(1)
         
-        download_count = 0
-        duplicate_count = 0
+        self.download_count = 0
+        self.duplicate_count = 0
+        # Guards the counters and claimed paths; workers wait on it for a
+        # download slot when max_files is nearly reached
+        self._state = threading.Condition()
+        self._stop = threading.Event()
+        self._claimed = set()
         page_num = 1
         
         print(f"Searching for: \"{self.search_query}\"")
         print(f"Starting download from: {base_url}")
         
-        while True:
-            print(f"Processing search page {page_num}...")
-            url = f"https://www.furaffinity.net/search/?q={encoded_query}&perpage={self.perpage}&order-by=date&order-direction=desc&page={page_num}"
-            
-            response = self._make_request(url)
-            if not response:
-                break
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        self._metadata_executor = ThreadPoolExecutor(max_workers=METADATA_WORKERS)
+        self._metadata_slots = threading.BoundedSemaphore(METADATA_QUEUE_SIZE)
+        try:
+            next_page = executor.submit(self._fetch_search_page, page_num)
+            while True:
+                print(f"Processing search page {page_num}...")
                 
-            html_content = response.read().decode('utf-8')
-            
-            if "/login/" in response.url and self.cookie_file:
-                print("ERROR: Invalid or expired cookies. Please log in to FurAffinity and export new cookies.")
-                sys.exit(1)
-            
-            if "No results found" in html_content:
-                if page_num == 1:
-                    print(f"No search results found for \"{self.search_query}\".")
-                    return
-                else:
-                    print("No more search results found.")
+                page = next_page.result()
+                if not page:
                     break
-            
-            artwork_pages = self._extract_artwork_urls(html_content)
-            if not artwork_pages:
-                print(f"No artwork links found on page {page_num}. This might be the last page.")
-                break
-            
-            for page_path in artwork_pages:
-                page_url = f"https://www.furaffinity.net{page_path}"
-                print(f"Processing submission: {page_url}")
-                
-                artwork_response = self._make_request(page_url)
-                if not artwork_response:
-                    continue
-                    
-                artwork_html = artwork_response.read().decode('utf-8')
+                page_url, html_content = page
                 
-                # Skip if system message (inaccessible)
-                if "System Message" in artwork_html:
-                    print(f"WARNING: {page_path} seems to be inaccessible, skipping.")
-                    continue
-                
-                image_url = self._extract_image_url(artwork_html)
-                if not image_url:
-                    print(f"WARNING: Could not find download URL for {page_path}, skipping.")
-                    continue
+                if "/login/" in page_url and self.cookie_file:
+                    print("ERROR: Invalid or expired cookies. Please log in to FurAffinity and export new cookies.")
+                    sys.exit(1)
                 
-                title, description, artist = self._extract_metadata(artwork_html)
+                if b"No results found" in html_content:
+                    if page_num == 1:
+                        print(f"No search results found for \"{self.search_query}\".")
+                        return
+                    else:
+                        print("No more search results found.")
+                        break
                 
-                artist_dir = os.path.join(self.outdir, artist)
-                os.makedirs(artist_dir, exist_ok=True)
+                # The same submission is usually linked more than once per page
+                artwork_pages = list(dict.fromkeys(self._extract_artwork_urls(self._parse_html(html_content))))
+                if not artwork_pages:
+                    print(f"No artwork links found on page {page_num}. This might be the last page.")
+                    break
                 
-                file_ext = os.path.splitext(image_url)[1]
-                file_name = os.path.basename(image_url)
+                # Fetch the next search page in the background while this page's
+                # submissions are processed; it is queued first so it is not
+                # starved by the submission jobs
+                next_page = executor.submit(self._fetch_search_page, page_num + 1)
                 
-                if self.rename:
-                    safe_title = re.sub(r'[^A-Za-z0-9._-]', ' ', title)
-                    file_path = os.path.join(artist_dir, f"{safe_title}{file_ext}")
-                else:
-                    file_path = os.path.join(artist_dir, file_name)
+                # Submissions on a page are independent, so fetch them concurrently;
+                # the worker count caps the number of open connections
+                futures = [executor.submit(self._process_submission, page_path) for page_path in artwork_pages]
+                for future in futures:
+                    future.result()
                 
-                if os.path.exists(file_path) and not self.overwrite:
-                    print(f"File already exists, skipping: {file_path}")
-                    duplicate_count += 1
-                    if self.max_duplicates > 0 and duplicate_count >= self.max_duplicates:
-                        print(f"Reached set maximum of consecutive duplicate files ({self.max_duplicates})")
-                        return
-                else:
-                    success = self._download_file(image_url, file_path)
-                    if success:
-                        duplicate_count = 0
-                        download_count += 1
-                        
-                        # Add metadata to the file
-                        self._add_metadata(file_path, title, description)
-                        
-                        # Check if we've reached the download limit
-                        if self.max_files > 0 and download_count >= self.max_files:
-                            print(f"Reached set file download limit ({self.max_files}).")
-                            return
+                if self._stop.is_set():
+                    return
                 
-                time.sleep(0.5)
-            
-            # Move to next page
-            page_num += 1
+                # Move to next page
+                page_num += 1
+        finally:
+            self._stop.set()
+            with self._state:
+                self._state.notify_all()
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Let queued metadata writes finish before returning
+            self._metadata_executor.shutdown(wait=True)
+            if self._meta_log:
+                self._meta_log.close()
             
         print("Search download complete!")
 
@@ -325,9 +737,11 @@ def main():
     parser.add_argument('-n', '--max-files', type=int, default=0, help='Maximum number of files to download')
     parser.add_argument('-d', '--max-duplicates', type=int, default=0, help='Maximum consecutive duplicates before exiting')
     parser.add_argument('-w', '--overwrite', action='store_true', help='Overwrite existing files')
-    parser.add_argument('-s', '--separate-meta', action='store_true', help='Create separate metadata files')
+    parser.add_argument('-s', '--separate-meta', action='store_true', help=f'Write text metadata to {METADATA_LOG_NAME} in the output directory')
+    parser.add_argument('-m', '--meta-files', action='store_true', help='Create a separate .meta file next to each download')
     parser.add_argument('-t', '--classic', action='store_true', help='Use classic theme selectors')
     parser.add_argument('-l', '--perpage', type=int, default=72, help='Number of results per page')
+    parser.add_argument('-j', '--jobs', type=int, default=8, help='Number of submissions to process concurrently')
     
     args = parser.parse_args()
     